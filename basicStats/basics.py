@@ -1,15 +1,45 @@
+import functools
+from collections import namedtuple
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype, is_string_dtype
 from scipy.stats import trim_mean, mode
 from scipy.stats import skew, skewtest, kurtosis, kurtosistest
-from statistics import mean, median
 
 
 DEFAULT_SIG_LEVEL = 0.05
+SUMMARY_STATISTICS = ['mean', 'median', 'min', 'max', 'std', 'skew', 'kurt']
+# nan is left out because nan != nan; nulls are caught separately with isna
+_MISSING_VALUE_FORMATS = frozenset([' ', '""', "''", '()', '[]', '{}', '?', '*', '.'])
+
+
+def _non_null_unique(column, limit=None):
+    """non-null unique values plus whether any null was dropped, from a single null mask
+    categorical and boolean columns are answered from their codes / truth values without hashing
+    with a limit, hashing stops in the first chunk that brings the count above it, and the result
+    then holds only the (more than limit) values seen so far"""
+    if isinstance(column, pd.Series) and isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories)) > 0
+        return column.cat.categories.to_numpy()[used], bool((codes < 0).any())
+    values = np.asarray(column)
+    if values.dtype == bool:
+        return np.array([True, False])[[values.any(), not values.all()]], False
+    missing = pd.isna(values)
+    present = values[~missing]
+    if limit is None:
+        return pd.unique(present), bool(missing.any())
+    uniques, start, chunk = present[:0], 0, 1024
+    while start < len(present) and len(uniques) <= limit:
+        uniques = pd.unique(np.concatenate([uniques, present[start:start + chunk]]))
+        start, chunk = start + chunk, chunk * 2
+    return uniques, bool(missing.any())
 
 
 def get_unique_values(column):
-    return np.unique(column[~np.isnan(column)])
+    """non-null unique values: category order for a categorical column, [True, False] for a boolean one,
+    otherwise order of appearance (hash-based, so no sort is needed)"""
+    return _non_null_unique(column)[0]
 
 
 def unique_values_count(column):
@@ -19,19 +49,26 @@ def unique_values_count(column):
 
 def binary_column_recognition(column: 'np.array') -> 'boolean value':
     """Recognise columns with only two unique values for later ETL"""
-    return unique_values_count(column) == 2
+    return len(_non_null_unique(column, limit=2)[0]) == 2
+
+
+def _is_string_or_integer(column):
+    """dtype check, looking at the categories of a categorical column"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.dtype.categories
+    return is_integer_dtype(column) or is_string_dtype(column)
 
 
 def categorical_column_recognition(column):
     """Recognise existing or potential categorical variables"""
-    condition1 = 2 < unique_values_count(column) <= 30
-    condition2 = isinstance(get_unique_values(column)[0], (np.str, np.integer))
-    return condition1 and condition2
+    if not _is_string_or_integer(column):
+        return False
+    return 2 < unique_values_count(column) <= 30
 
 
 def get_mean(column):
     """Sample mean"""
-    return mean(column)
+    return np.mean(column)
 
 
 def get_X_perc_trimmed_mean(column, trimmed_ratio):
@@ -41,7 +78,7 @@ def get_X_perc_trimmed_mean(column, trimmed_ratio):
 
 
 def get_median(column):
-    return median(column)
+    return np.median(column)
 
 
 def get_mode(column):
@@ -81,189 +118,258 @@ def get_skewness_p_values(column):
     return skewtest(column)
 
 
+def _central_moments(values):
+    """Column-wise mean and 2nd to 4th central moments of a 2D array, all sharing one mean"""
+    first = values.mean(axis=0)
+    deviations = values - first
+    squared = deviations * deviations
+    return (first, squared.mean(axis=0),
+            np.einsum('ij,ij->j', squared, deviations) / len(values),
+            np.einsum('ij,ij->j', squared, squared) / len(values))
+
+
+def _skewness_and_kurtosis(values):
+    """Same (biased) estimates as scipy's skew and Fisher kurtosis, derived from one moment pass
+    constant columns give nan: exactly constant ones are caught even when rounding in the mean leaves a
+    tiny variance (scipy's answer there depends on memory layout), nearly constant ones by scipy's tolerance"""
+    first, m2, m3, m4 = _central_moments(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        constant = (np.ptp(values, axis=0) == 0) | (m2 <= (np.finfo(m2.dtype).eps * first) ** 2)
+        return np.where(constant, np.nan, m3 / m2 ** 1.5), np.where(constant, np.nan, m4 / m2 ** 2 - 3)
+
+
+def _is_continuous_dtype(dtype):
+    return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+
+
 def continuous_variable_recognition(column):
-    column = get_unique_values(column) # drop nulls
-    first_value = column[0]
-    return unique_values_count(column) > 2 and (isinstance(first_value, (np.integer, np.float)))
+    """Numeric (non-boolean) dtype with more than two unique values, the dtype is checked before any scan"""
+    if not _is_continuous_dtype(column.dtype):
+        return False
+    return unique_values_count(column) > 2
 
 
 def column_with_missing_value(column: 'np.array') -> 'boolean value':
     """Recognise columns with missing values
     only covers apparent cases such as
     whitespaces, nan, null, na, none, question-mark, empty parenthesis"""
-    common_missing_value_format = [np.nan, ' ', '""', "''", '()', '[]', '{}', '?', '*', '.']
-    for value in column:
-        if value in common_missing_value_format:
-            return True
-        else:
-            return False
+    column = pd.Series(column)
+    if column.isna().any():
+        return True
+    if is_numeric_dtype(column):
+        return False
+    return bool(column.isin(_MISSING_VALUE_FORMATS).any())
+
+
+def _fits_float32(column):
+    """float32 (~7 significant digits) is safe when the largest magnitude cannot overflow the n summed
+    4th powers of kurtosis, and the spread is at least 1/1000 of that magnitude, so rounding to float32
+    moves each deviation by under ~1e-4 of a standard deviation"""
+    largest = np.abs(column).max()
+    return largest < 1e9 / max(len(column), 1) ** 0.25 and column.std() >= 1e-3 * largest
+
+
+def _downcast_floats(table):
+    """Copy of table with float64 columns stored as float32 wherever that is safe"""
+    safe_columns = [name for name, column in table.select_dtypes(include=[np.float64]).items()
+                    if _fits_float32(column)]
+    return table.astype({name: np.float32 for name in safe_columns})
+
+
+_ColumnProfile = namedtuple('_ColumnProfile', ['dtype', 'string_or_integer', 'n_unique', 'has_missing'])
 
 
 class raw_data:
 
-    def __init__(self, raw_table):
+    _cached_properties = ('_col_profile', '_numeric_frame', '_continuous_frame', '_numeric_matrix', '_summary')
+
+    def __init__(self, raw_table, low_precision=False):
+        """low_precision stores float64 columns as float32, halving the table's memory.
+        Columns whose magnitude could overflow float32 in the kurtosis moments, or whose spread is too
+        small next to their magnitude to survive float32 rounding, are kept as float64. The moment,
+        trimmed-mean and mode calculations still run in float64."""
+        if low_precision:
+            raw_table = _downcast_floats(raw_table)
         self.raw_data = raw_table
 
+    @property
+    def raw_data(self):
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, raw_table):
+        """The table is copied, so later in-place changes to the caller's DataFrame cannot leave the
+        cached scans half-stale; reassign raw_data to analyse a changed table"""
+        self._raw_data = raw_table.copy()
+        for name in self._cached_properties:
+            self.__dict__.pop(name, None)
+
+    @functools.cached_property
+    def _col_profile(self):
+        """Scan every column once, keyed by column name
+        counting unique values stops once a column has more than 30, no recogniser needs more detail"""
+        profile = {}
+        for name, column in self.raw_data.items():
+            uniques, has_null = _non_null_unique(column, limit=30)
+            # once the count is capped the unique set is partial, so placeholders are looked up in the column
+            has_placeholder = column_with_missing_value(uniques if len(uniques) <= 30 else column)
+            profile[name] = _ColumnProfile(column.dtype, _is_string_or_integer(column), len(uniques),
+                                           bool(has_null or has_placeholder))
+        return profile
+
+    @functools.cached_property
+    def _numeric_frame(self):
+        """Columns the summary statistics run on, selected once per table
+        categorical columns are swapped for their plain values, pandas refuses min/max on unordered ones"""
+        numeric_frame = self.raw_data.select_dtypes(exclude=[object, bool]).copy(deep=False)
+        for position, dtype in enumerate(numeric_frame.dtypes):
+            if isinstance(dtype, pd.CategoricalDtype):
+                numeric_frame.isetitem(position, np.asarray(numeric_frame.iloc[:, position]))
+        return numeric_frame
+
+    @functools.cached_property
+    def _continuous_frame(self):
+        """Numeric, non-boolean columns of _numeric_frame (no datetimes, timedeltas or string categories)"""
+        return self._numeric_frame.loc[:, [_is_continuous_dtype(dtype) for dtype in self._numeric_frame.dtypes]]
+
+    @functools.cached_property
+    def _numeric_matrix(self):
+        """_continuous_frame as one column-major float64 array, so every axis=0 reduction walks contiguous memory
+        missing values, pandas NA included, become NaN"""
+        return np.asfortranarray(self._continuous_frame.to_numpy(dtype=np.float64, na_value=np.nan))
+
+    @functools.cached_property
+    def _summary(self):
+        """Every statistic in SUMMARY_STATISTICS for every numeric (non-boolean) column, aggregated once per table"""
+        if self._continuous_frame.shape[1] == 0:
+            return pd.DataFrame(index=SUMMARY_STATISTICS)
+        return self._continuous_frame.agg(SUMMARY_STATISTICS)
+
+    def _profile_mask(self, condition):
+        return [condition(self._col_profile[name]) for name in self.raw_data.columns]
+
     def get_row_number(self):
-        if self.raw_data.shape[0] > 0:
-            return self.raw_data.shape[0]
-        else:
-            print('Hey, looks like you have not read the file properly.\nTry again!')
+        if self.raw_data.shape[0] == 0:
+            raise ValueError('Hey, looks like you have not read the file properly. Try again!')
+        return self.raw_data.shape[0]
 
     def get_column_number(self):
-        if self.raw_data.shape[1] > 0:
-            return self.raw_data.shape[1]
-        else:
-            print('Hey, looks like you have not read the file properly.\nTry again!')
+        if self.raw_data.shape[1] == 0:
+            raise ValueError('Hey, looks like you have not read the file properly. Try again!')
+        return self.raw_data.shape[1]
 
-    def sample_n_rows(self, n):
+    def sample_n_rows(self, n, random_state=None):
+        """random_state is a seed or numpy Generator; without it rows are drawn from numpy's global
+        random state, so np.random.seed still makes the sample reproducible"""
         if n < 1:
-            print('Error: please enter integer >= 1')
-        else:
-            return self.raw_data.sample(round(n))
+            raise ValueError('please enter integer >= 1')
+        generator = np.random if random_state is None else np.random.default_rng(random_state)
+        rows = generator.choice(len(self.raw_data), size=round(n), replace=False)
+        return self.raw_data.iloc[rows]
 
     def get_values(self):
-        if self.get_row_number() > 0:
-            return self.raw_data
-        else:
-            print('Hey, looks like you have not read the file properly.\nTry again!')
+        self.get_row_number()
+        return self.raw_data
 
     def get_columns(self):
-        if len(list(self.raw_data.columns.values)) > 0:
-            return list(self.raw_data.columns.values)
-        else:
-            print('Hey, looks like you have not read the file properly.\nTry again!')
+        self.get_column_number()
+        return list(self.raw_data.columns.values)
 
     def get_binary_column_list(self):
-        binary_columns = self.raw_data.columns[self.raw_data.apply(binary_column_recognition, axis=0)]
-        if len(binary_columns) > 0:
-            return list(binary_columns.values)
-        else:
-            print('Looks like there is no binary column')
+        binary_columns = self.raw_data.columns[self._profile_mask(lambda column: column.n_unique == 2)]
+        return list(binary_columns.values)
 
     def get_non_binary_column_list(self):
-        non_binary_columns = [x for x in self.get_columns() if x not in self.get_binary_column_list()]
-        if len(non_binary_columns) > 0:
-            return non_binary_columns
-        else:
-            print('Looks like there is no non-binary column')
+        return list(self.raw_data.columns[self._profile_mask(lambda column: column.n_unique != 2)])
 
     def get_numeric_column_list(self):
-        numeric_columns = self.raw_data.columns[self.raw_data.apply(continuous_variable_recognition, axis=0)]
-        if len(numeric_columns) > 0:
-            return numeric_columns
-        else:
-            print('Looks like there is no numerical column')
+        numeric_columns = self.raw_data.columns[self._profile_mask(
+            lambda column: column.n_unique > 2 and _is_continuous_dtype(column.dtype))]
+        return numeric_columns
 
     def get_categorical_column_list(self):
-        cate_columns = self.raw_data.columns[self.raw_data.apply(categorical_column_recognition, axis=0)]
-        if len(cate_columns) > 0:
-            return cate_columns
-        else:
-            print('Looks like there is no categorical column')
+        cate_columns = self.raw_data.columns[self._profile_mask(
+            lambda column: 2 < column.n_unique <= 30 and column.string_or_integer)]
+        return cate_columns
 
     def get_columns_with_apparent_missing_values(self):
-        missing_value_columns = self.raw_data.columns[self.raw_data.apply(column_with_missing_value, axis=0)]
-        if len(missing_value_columns) > 0:
-            return list(missing_value_columns.values)
-        else:
-            print('Congratulations! There is no columns with obvious missing values.')
+        missing_value_columns = self.raw_data.columns[self._profile_mask(lambda column: column.has_missing)]
+        return list(missing_value_columns.values)
+
+    def describe_all(self):
+        """One row per statistic in SUMMARY_STATISTICS, one column per numeric column
+        skew and kurt here are pandas' bias-corrected estimates, so they differ slightly from
+        get_skewness_report / get_kurtosis_report, which give the biased (scipy default) estimates"""
+        return self._summary.copy()
 
     def get_mean_traditional(self):
-        traditional_mean = \
-            self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_mean, axis=0)
-        if len(traditional_mean) > 0:
-            return traditional_mean
-        else:
-            print('No mean values calculated, check your data ingestion.')
+        return self._numeric_frame.mean()
 
     def get_mean_trimmed(self, r=0.05):
-        trimmed_mean = \
-            self.raw_data.select_dtypes(exclude=[object, bool]).apply(lambda x: get_X_perc_trimmed_mean(x, r), axis=0)
-        if len(trimmed_mean) > 0:
-            return trimmed_mean
-        else:
-            print('No mean values calculated, check your data ingestion.')
+        trimmed_means = trim_mean(self._numeric_matrix, r, axis=0, nan_policy='omit')
+        return pd.Series(trimmed_means, index=self._continuous_frame.columns)
 
     def get_median(self):
-        medians = \
-            self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_median, axis=0)
-        if len(medians) > 0:
-            return medians
-        else:
-            print('No median values calculated, check your data ingestion.')
+        return self._numeric_frame.median()
 
     def get_mode(self):
-        modes = \
-            self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_mode, axis=0)
-        if len(modes) > 0:
-            return modes
-        else:
-            print('No mode values calculated, check your data ingestion.')
+        """Most common value per column (the smallest on ties), missing values skipped
+        the Series keeps the columns' dtype when they all share one, e.g. int64 or Int64"""
+        matrix_modes = mode(self._numeric_matrix, axis=0, nan_policy='omit', keepdims=False).mode
+        matrix_modes = dict(zip(self._continuous_frame.columns, matrix_modes))
+        modes = []
+        for name, column in self._numeric_frame.items():
+            if name in matrix_modes and not np.isnan(matrix_modes[name]):
+                modes.append(pd.Series([matrix_modes[name]]).astype(column.dtype).iloc[0])
+            else:
+                # datetimes and other non-float columns, or a column with nothing but missing values
+                column_modes = column.mode(dropna=True)
+                modes.append(column_modes.iloc[0] if len(column_modes) else np.nan)
+        modes = pd.Series(modes, index=self._numeric_frame.columns, dtype=None if modes else float)
+        if self._numeric_frame.dtypes.nunique() == 1 and modes.notna().all():
+            modes = modes.astype(self._numeric_frame.dtypes.iloc[0])
+        return modes
 
     def get_minimums(self):
-        minimums = \
-            self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_min, axis=0)
-        if len(minimums) > 0:
-            return minimums
-        else:
-            print('No minimum values calculated, check your data ingestion.')
+        return self._numeric_frame.min()
 
     def get_maximums(self):
-        maximums = \
-            self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_max, axis=0)
-        if len(maximums) > 0:
-            return maximums
-        else:
-            print('No maximum values calculated, check your data ingestion.')
+        return self._numeric_frame.max()
 
     def get_range(self):
-        ranges = self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_range, axis=0)
-        if len(ranges) > 0:
-            return ranges
-        else:
-            print('Something is wrong, check your data ingestion.')
+        minimums, maximums = self._numeric_frame.min(), self._numeric_frame.max()
+        ranges = pd.Series(['({0:.2f} ~ {1:.2f})'.format(low, high) for low, high in zip(minimums, maximums)],
+                           index=self._numeric_frame.columns, dtype=object)
+        return ranges
 
     def get_kurtosis_report(self, sig_level=DEFAULT_SIG_LEVEL):
-        kurtosis_vals = self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_kurtosis, axis=0)
-        test_p_vals = self.raw_data.select_dtypes(exclude=[object, bool]).\
-            apply(lambda x: get_kurtosis_p_values(x)[1], axis=0)
+        columns, values = self._continuous_frame.columns, self._numeric_matrix
+        kurtosis_vals = pd.Series(_skewness_and_kurtosis(values)[1], index=columns)
+        test_p_vals = pd.Series(kurtosistest(values, axis=0).pvalue, index=columns)
         stat_significant = test_p_vals < sig_level
         column_names = {0: 'excess_kurtosis_values', 1: 'weight_of_tail_p_values', 2: 'is_statistically_significant'}
-        if len(kurtosis_vals) > 0:
-            return pd.concat([kurtosis_vals, test_p_vals, stat_significant], axis=1).rename(columns=column_names)
-        else:
-            print('Something is wrong, check your data ingestion.')
+        return pd.concat([kurtosis_vals, test_p_vals, stat_significant], axis=1).rename(columns=column_names)
 
     def get_skewness_report(self, sig_level=DEFAULT_SIG_LEVEL):
-        skewness_vals = self.raw_data.select_dtypes(exclude=[object, bool]).apply(get_skewness, axis=0)
-        test_p_vals = self.raw_data.select_dtypes(exclude=[object, bool]).\
-            apply(lambda x: get_skewness_p_values(x)[1], axis=0)
+        columns, values = self._continuous_frame.columns, self._numeric_matrix
+        skewness_vals = pd.Series(_skewness_and_kurtosis(values)[0], index=columns)
+        test_p_vals = pd.Series(skewtest(values, axis=0).pvalue, index=columns)
         stat_significant = test_p_vals < sig_level
         column_names = {0: 'skewness_values', 1: 'skewness_p_values', 2: 'is_statistically_significant'}
-        if len(skewness_vals) > 0:
-            return pd.concat([skewness_vals, test_p_vals, stat_significant], axis=1).rename(columns=column_names)
-        else:
-            print('Something is wrong, check your data ingestion.')
+        return pd.concat([skewness_vals, test_p_vals, stat_significant], axis=1).rename(columns=column_names)
 
     def get_normality_report(self, sig_level=DEFAULT_SIG_LEVEL):
         only_continuous_variables = self.get_numeric_column_list()
-        skewness_vals = \
-            self.raw_data[only_continuous_variables].select_dtypes(exclude=[object, bool]).apply(get_skewness, axis=0)
-        skewness_test_results = \
-            self.raw_data[only_continuous_variables].select_dtypes(exclude=[object, bool]).\
-            apply(lambda x: get_skewness_p_values(x)[1] < sig_level, axis=0)
-        kurtosis_vals = \
-            self.raw_data[only_continuous_variables].select_dtypes(exclude=[object, bool]).apply(get_kurtosis, axis=0)
-        kurtosis_test_results = \
-            self.raw_data[only_continuous_variables].select_dtypes(exclude=[object, bool]). \
-            apply(lambda x: get_kurtosis_p_values(x)[1] < sig_level, axis=0)
+        selected = self._continuous_frame.columns.isin(only_continuous_variables)
+        columns, values = self._continuous_frame.columns[selected], self._numeric_matrix[:, selected]
+        skewness, kurtosis_excess = _skewness_and_kurtosis(values)
+        skewness_vals = pd.Series(skewness, index=columns)
+        skewness_test_results = pd.Series(skewtest(values, axis=0).pvalue < sig_level, index=columns)
+        kurtosis_vals = pd.Series(kurtosis_excess, index=columns)
+        kurtosis_test_results = pd.Series(kurtosistest(values, axis=0).pvalue < sig_level, index=columns)
         column_names = {0: 'skewness_values', 1: 'skew_is_significant',
                         2: 'excess_kurtosis', 3: 'tail_weight_is_significant'}
-        if len(skewness_vals) > 0:
-            return pd.concat([skewness_vals, skewness_test_results, kurtosis_vals, kurtosis_test_results],
-                             axis=1).rename(columns=column_names)
-        else:
-            print('Something is wrong, check your data ingestion.')
+        return pd.concat([skewness_vals, skewness_test_results, kurtosis_vals, kurtosis_test_results],
+                         axis=1).rename(columns=column_names)
 
 
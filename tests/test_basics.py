@@ -0,0 +1,246 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import kurtosis, skew
+
+from basicStats.basics import (raw_data, binary_column_recognition, categorical_column_recognition,
+                               column_with_missing_value, get_unique_values, unique_values_count,
+                               SUMMARY_STATISTICS, _skewness_and_kurtosis)
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({'flag': [0, 1, 0, 1, 1, 0, 1, 0],
+                         'x': [1.5, 2.5, 3.5, 4.0, 8.0, 2.0, 1.0, 6.5],
+                         'count': [1, 2, 3, 4, 5, 6, 7, 8]})
+
+
+def test_empty_table_raises():
+    data = raw_data(pd.DataFrame())
+    for method in (data.get_row_number, data.get_column_number, data.get_values, data.get_columns):
+        with pytest.raises(ValueError):
+            method()
+
+
+def test_sample_n_rows_rejects_less_than_one(table):
+    with pytest.raises(ValueError):
+        raw_data(table).sample_n_rows(0)
+
+
+def test_table_is_snapshotted(table):
+    data = raw_data(table)
+    assert data.get_mean_traditional()['x'] == 3.625
+    table['x'] = table['x'] * 10
+    table['y'] = [0.0, 1.0] * 4
+    table.drop(index=[0, 1, 2, 3, 4], inplace=True)
+    assert data.get_row_number() == 8
+    assert data.get_column_number() == 3
+    assert data.get_mean_traditional()['x'] == 3.625
+    assert data.get_binary_column_list() == ['flag']
+    data.raw_data = table
+    assert data.get_row_number() == 3
+    assert len(data.sample_n_rows(2)) == 2
+    assert data.get_mean_traditional()['x'] == pytest.approx(95 / 3)
+    assert data.get_binary_column_list() == ['flag', 'y']
+
+
+def test_column_lists_are_empty_instead_of_none():
+    data = raw_data(pd.DataFrame({'x': [1.5, 2.5, 3.5]}))
+    assert data.get_binary_column_list() == []
+    assert data.get_columns_with_apparent_missing_values() == []
+    assert list(data.get_categorical_column_list()) == []
+
+
+def test_statistics_are_empty_without_numeric_columns():
+    data = raw_data(pd.DataFrame({'name': ['a', 'b', 'c']}))
+    assert data.get_mean_traditional().empty
+    assert data.get_range().empty
+    assert data.get_skewness_report().empty
+    assert data.describe_all().empty
+
+
+def test_describe_all(table):
+    summary = raw_data(table).describe_all()
+    assert list(summary.index) == SUMMARY_STATISTICS
+    assert list(summary.columns) == ['flag', 'x', 'count']
+    assert summary.loc['mean', 'count'] == 4.5
+    assert summary.loc['max', 'x'] == 8.0
+    assert np.isclose(summary.loc['skew', 'count'], 0.0)
+
+
+def test_getters_reduce_each_column_on_its_own():
+    data = raw_data(pd.DataFrame({'count': [3, 1, 2],
+                                  'when': pd.to_datetime(['2020-01-02', '2020-01-01', '2020-01-03']),
+                                  'level': pd.Series([1, 2, 2]).astype('category')}))
+    minimums, maximums = data.get_minimums(), data.get_maximums()
+    assert minimums['count'] == 1 and maximums['count'] == 3
+    assert minimums['when'] == pd.Timestamp('2020-01-01')
+    assert maximums['level'] == 2
+    assert data.get_mean_traditional()['level'] == pytest.approx(5 / 3)
+    assert list(data.describe_all().columns) == ['count', 'level']
+
+
+def test_minimums_keep_integer_dtype():
+    minimums = raw_data(pd.DataFrame({'a': [3, 1, 2], 'b': [4, 6, 5]})).get_minimums()
+    assert minimums.dtype == np.int64
+    assert minimums.name is None
+
+
+def test_normality_report_skips_datetime_columns():
+    rng = np.random.default_rng(0)
+    data = raw_data(pd.DataFrame({'x': rng.normal(size=30),
+                                  'when': pd.date_range('2020-01-01', periods=30)}))
+    report = data.get_normality_report()
+    assert list(report.index) == ['x']
+    assert list(data.get_skewness_report().index) == ['x']
+
+
+def test_low_precision_matches_full_precision():
+    rng = np.random.default_rng(2)
+    table = pd.DataFrame({'well_spread': rng.normal(size=1000),
+                          'large_offset': rng.normal(size=1000) * 10 + 3e7,
+                          'huge': np.full(1000, 1e12),
+                          'count': np.arange(1000) + 2 ** 25})
+    full, low = raw_data(table), raw_data(table, low_precision=True)
+    assert low.raw_data.dtypes.to_dict() == {'well_spread': np.float32, 'large_offset': np.float64,
+                                             'huge': np.float64, 'count': np.int64}
+    assert low._numeric_matrix.dtype == np.float64
+    for method in ('get_skewness_report', 'get_kurtosis_report'):
+        expected, actual = getattr(full, method)(), getattr(low, method)()
+        assert np.allclose(actual.iloc[:, 0], expected.iloc[:, 0], atol=1e-4, equal_nan=True)
+    assert np.allclose(low.get_mean_trimmed(), full.get_mean_trimmed(), rtol=1e-6)
+    assert low.get_mode()['count'] == full.get_mode()['count']
+
+
+@pytest.fixture
+def awkward_table():
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({'x': rng.normal(size=30),
+                         'nullable': pd.array([None] + list(range(29)), dtype='Int64'),
+                         'when': pd.date_range('2020-01-01', periods=30)})
+
+
+def test_trimmed_mean_with_nullable_and_datetime_columns(awkward_table):
+    trimmed = raw_data(awkward_table).get_mean_trimmed(0.1)
+    assert list(trimmed.index) == ['x', 'nullable']
+    assert trimmed['nullable'] == pytest.approx(14.0)
+
+
+def test_mode_with_nullable_column():
+    table = pd.DataFrame({'x': [1.5, 2.5, 2.5, 3.0],
+                          'nullable': pd.array([7, None, 7, 1], dtype='Int64')})
+    assert raw_data(table).get_mode().to_dict() == {'x': 2.5, 'nullable': 7}
+    modes = raw_data(table[['nullable']]).get_mode()
+    assert modes.dtype == 'Int64' and modes['nullable'] == 7
+
+
+def test_mode_keeps_integer_and_datetime_columns():
+    table = pd.DataFrame({'a': [5, 5, 1], 'b': [2, 3, 3]})
+    modes = raw_data(table).get_mode()
+    assert modes.dtype == np.int64 and modes.to_dict() == {'a': 5, 'b': 3}
+    table['when'] = pd.to_datetime(['2020-01-02', '2020-01-01', '2020-01-02'])
+    assert raw_data(table).get_mode()['when'] == pd.Timestamp('2020-01-02')
+
+
+def test_reports_with_nullable_column(awkward_table):
+    data = raw_data(awkward_table)
+    for report in (data.get_kurtosis_report(), data.get_skewness_report(), data.get_normality_report()):
+        assert list(report.index) == ['x', 'nullable']
+        assert report.loc['x'].notna().all()
+        assert np.isnan(report.iloc[1, 0])
+
+
+def test_min_max_with_string_categorical_column():
+    data = raw_data(pd.DataFrame({'count': [3, 1, 2],
+                                  'letter': pd.Series(['w', 'u', 'v']).astype('category')}))
+    assert data.get_minimums().to_dict() == {'count': 1, 'letter': 'u'}
+    assert data.get_maximums().to_dict() == {'count': 3, 'letter': 'w'}
+
+
+def test_sample_n_rows_is_reproducible(table):
+    data = raw_data(table)
+    np.random.seed(0)
+    first = data.sample_n_rows(3)
+    np.random.seed(0)
+    assert first.equals(data.sample_n_rows(3))
+    assert data.sample_n_rows(3, random_state=5).equals(data.sample_n_rows(3, random_state=5))
+
+
+def test_capped_unique_scan():
+    many = pd.DataFrame({'id': np.arange(5000), 'label': ['a', 'b'] * 2499 + ['c', '?'],
+                         'flag': [0, 1] * 2500})
+    data = raw_data(many)
+    assert data._col_profile['id'].n_unique == 1024  # hashing stopped after the first chunk
+    assert data.get_binary_column_list() == ['flag']
+    assert list(data.get_categorical_column_list()) == ['label']
+    assert data.get_columns_with_apparent_missing_values() == ['label']
+    assert binary_column_recognition(many['flag'])
+    assert not binary_column_recognition(many['label'])
+
+
+def test_skewness_and_kurtosis_match_scipy():
+    rng = np.random.default_rng(3)
+    # column-major like raw_data's numeric matrix; scipy only reports nan for the constant column in that layout
+    values = np.asfortranarray(np.column_stack([rng.exponential(size=200), rng.normal(size=200) * 5 + 100,
+                                                np.full(200, 4.2), np.r_[np.nan, rng.normal(size=199)]]))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        skewness, excess_kurtosis = _skewness_and_kurtosis(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected_skewness, expected_kurtosis = skew(values), kurtosis(values)
+    assert np.allclose(skewness, expected_skewness, equal_nan=True)
+    assert np.allclose(excess_kurtosis, expected_kurtosis, equal_nan=True)
+    assert np.isnan(skewness[2:]).all()
+    assert np.isnan(_skewness_and_kurtosis(np.ascontiguousarray(values))[1][2])
+
+
+def test_missing_value_placeholder_in_a_later_row():
+    assert column_with_missing_value(pd.Series(['a', 'b', 'c', '?']))
+    assert column_with_missing_value(pd.Series(['a', 'b', None]))
+    assert not column_with_missing_value(pd.Series(['a', 'b', 'c']))
+
+
+def test_missing_value_check_skips_placeholders_for_numeric_columns(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('isin should not run on numeric columns')
+    monkeypatch.setattr(pd.Series, 'isin', fail)
+    assert not column_with_missing_value(pd.Series([1.0, 2.0, 3.0]))
+    assert column_with_missing_value(pd.Series([1.0, np.nan]))
+
+
+@pytest.mark.parametrize('column, expected', [
+    (pd.Series(['a', 'b', 'c', 'a']), True),
+    (pd.Series([1, 2, 3, 3]), True),
+    (pd.Series([1, 2, 3]).astype('category'), True),
+    (pd.Series(['a', 'b']), False),
+    (pd.Series(np.arange(31)), False),
+    (pd.Series([1.5, 2.5, 3.5]), False),
+    (pd.Series(['a', 1.5, 'c'], dtype=object), False),
+])
+def test_categorical_column_recognition(column, expected):
+    assert categorical_column_recognition(column) is expected
+
+
+def test_categorical_column_list_matches_recogniser():
+    table = pd.DataFrame({'letter': list('abcab'), 'level': [1, 2, 3, 1, 2], 'x': [1.5, 2.5, 3.5, 4.5, 5.5]})
+    assert list(raw_data(table).get_categorical_column_list()) == ['letter', 'level']
+
+
+def test_unique_values_of_categorical_with_unused_categories():
+    column = pd.Series(['x', 'y', None, 'x'], dtype='category').cat.add_categories(['unused'])
+    assert list(get_unique_values(column)) == ['x', 'y']
+    assert unique_values_count(column) == 2
+    assert raw_data(pd.DataFrame({'c': column}))._col_profile['c'].has_missing
+
+
+@pytest.mark.parametrize('values, expected', [([True, False, True], [True, False]),
+                                              ([False, False], [False]),
+                                              ([True], [True]),
+                                              ([], [])])
+def test_unique_values_of_boolean_column(values, expected):
+    column = np.array(values, dtype=bool)
+    assert list(get_unique_values(column)) == expected
+    assert unique_values_count(pd.Series(column)) == len(expected)